@@ -70,6 +70,18 @@ class _AudioBoardIOController(object):
                  index, offset, value)
     self._io_expanders[index].SetBit(offset, value)
 
+  def SetBits(self, index, mask, value):
+    """Sets the masked bits as output and sets their values to 1 or 0.
+
+    Args:
+      index: The index number of I/O expander.
+      mask: The bitwise mask of the bits to set.
+      value: 1 or 0.
+    """
+    logging.info('Set I/O expander #%d, bit mask 0x%04x to %d',
+                 index, mask, value)
+    self._io_expanders[index].SetBits(mask, value)
+
   def ReadBit(self, index, offset):
     """Sets a bit as input and reads its value.
 
@@ -168,8 +180,7 @@ class _AudioBoardSwitchController(object):
 
   def _ResetSwitches(self):
     """Turns off all switches."""
-    for number in self._SWITCH_EXPANDER_BIT_MAP.iterkeys():
-      self.EnableSwitch(number, False)
+    self.EnableSwitches(self._SWITCH_EXPANDER_BIT_MAP.iterkeys(), False)
 
   def EnableSwitch(self, number, enabled):
     """Enables/disables a switch.
@@ -182,6 +193,20 @@ class _AudioBoardSwitchController(object):
     index, offset = self._SWITCH_EXPANDER_BIT_MAP[number]
     self._io_controller.SetBit(index, offset, 1 if enabled else 0)
 
+  def EnableSwitches(self, numbers, enabled):
+    """Enables/disables switches, with one update per I/O expander.
+
+    Args:
+      numbers: An iterable of the switch numbers.
+      enabled: True to enable switches. False otherwise.
+    """
+    masks = {}
+    for number in numbers:
+      index, offset = self._SWITCH_EXPANDER_BIT_MAP[number]
+      masks[index] = masks.get(index, 0) | (1 << offset)
+    for index, mask in sorted(masks.iteritems()):
+      self._io_controller.SetBits(index, mask, 1 if enabled else 0)
+
 
 class _JackPluggerException(Exception):
   """Error in _JackPlugger."""
@@ -246,6 +271,8 @@ class _JackPlugger(object):
       io_controller: An _AudioBoardIOController object.
     """
     self._io_controller = io_controller
+    # The last state commanded and confirmed; None if unknown.
+    self._plug_state = None
     self.Reset()
 
     logging.info('_JackPlugger initialized')
@@ -297,12 +324,32 @@ class _JackPlugger(object):
     Raises:
       _JackPluggerException if motor status does not meet the condition.
     """
+    if self._plug_state == plug and self._IsMotorInState(plug):
+      logging.info('Plugger state is already %s', 'Plug' if plug else 'Unplug')
+      return
     logging.info('Set plugger state to %s', 'Plug' if plug else 'Unplug')
+    self._plug_state = None
     self._SetPlugState(plug)
     time.sleep(self._SLEEP_AFTER_COMMAND_SECONDS)
     if self._GetPlugState() != plug:
       raise _JackPluggerException(
           'The motor plug status is not %s' % 'Plug' if plug else 'Unplug')
+    self._plug_state = plug
+
+  def _IsMotorInState(self, plug):
+    """Checks if the motor reports the given plug state.
+
+    Args:
+      plug: True for plugged. False otherwise.
+
+    Returns:
+      True if the motor reports the state; False if it reports the other
+      state or its status can not be queried.
+    """
+    try:
+      return self._GetPlugState() == plug
+    except _JackPluggerException:
+      return False
 
 
 class _BluetoothController(object):
@@ -454,6 +501,10 @@ AUDIO_BUS_SINKS = [AudioBusEndpoint.CROS_EXTERNAL_MICROPHONE,
 
 AUDIO_BUS_ENDPOINTS = AUDIO_BUS_SOURCES + AUDIO_BUS_SINKS
 
+# Endpoint sets for the membership checks in IsSource.
+_AUDIO_BUS_SOURCE_SET = frozenset(AUDIO_BUS_SOURCES)
+_AUDIO_BUS_SINK_SET = frozenset(AUDIO_BUS_SINKS)
+
 
 def IsSource(endpoint):
   """Checks if an endpoint is a signal source.
@@ -467,9 +518,9 @@ def IsSource(endpoint):
   Raises:
     AudioBusEndpointException if endpoint is not valid.
   """
-  if endpoint in AUDIO_BUS_SOURCES:
+  if endpoint in _AUDIO_BUS_SOURCE_SET:
     return True
-  elif endpoint in AUDIO_BUS_SINKS:
+  elif endpoint in _AUDIO_BUS_SINK_SET:
     return False
   else:
     raise AudioBusEndpointException('%s is not a valid endpoint' % endpoint)
@@ -542,8 +593,11 @@ class _AudioBus(object):
 
   def Reset(self):
     """Disconnects all endpoints from audio bus."""
-    for endpoint in AUDIO_BUS_ENDPOINTS:
-      self.Disconnect(endpoint)
+    logging.info('Disconnect all endpoints from audio bus %d', self._bus_number)
+    self._sources.clear()
+    self._sinks.clear()
+    self._switch_controller.EnableSwitches(
+        self._SWITCH_MAP[self._bus_number].itervalues(), False)
 
   def Connect(self, endpoint):
     """Connects an endpoint to audio bus.
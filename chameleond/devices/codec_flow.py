@@ -266,7 +266,8 @@ class OutputCodecFlow(CodecFlow):
     """
     self._audio_route_manager.SetupRouteFromMemoryToI2S()
     self._fpga.aiis.Enable()
-    audio_data = (open(path, 'r').read(), data_format)
+    with open(path, 'rb') as f:
+      audio_data = (f.read(), data_format)
     self._audio_stream_manager.StartPlayingAudioData(audio_data)
 
   @property
@@ -286,7 +286,7 @@ class FpgaInputFlow(chameleon_device.Flow):
     if not end_level:
       self.Unplug()
 
-  def FireMixedHpdPulses(self, widths_msec):
+  def FireMixedHpdPulses(self, widths_msec, hpd_only=False):
     """Fires one or more HPD pulses, starting at low, of mixed widths.
 
     One must specify a list of segment widths in the widths_msec argument where
@@ -296,12 +296,19 @@ class FpgaInputFlow(chameleon_device.Flow):
     The HPD line stops at low if even number of segment widths are specified;
     otherwise, it stops at high.
 
-    The method is equivalent to a series of calls to Unplug() and Plug()
-    separated by specified pulse widths.
+    By default, the method is equivalent to a series of calls to Unplug() and
+    Plug() separated by specified pulse widths.
 
     Args:
       widths_msec: list of pulse segment widths in milli-second.
+      hpd_only: True to only toggle the HPD line by the FPGA HPD controller;
+                see _FireMixedHpdPulsesByFpga(). False to call Unplug() and
+                Plug().
     """
+    if hpd_only:
+      self._FireMixedHpdPulsesByFpga(widths_msec)
+      return
+
     # Append a plug/unplug after the last pulse
     sleep_times = [w / 1000.0 for w in widths_msec] + [0.0]
     ops = [self.Unplug, self.Plug] * ((len(sleep_times) + 1) / 2)
@@ -322,6 +329,47 @@ class FpgaInputFlow(chameleon_device.Flow):
 
       time.sleep(sleep_time)
 
+  def _FireMixedHpdPulsesByFpga(self, widths_msec):
+    """Fires HPD pulses of mixed widths using the FPGA HPD controller.
+
+    The whole pattern is fired by a single hpd_control invocation, which only
+    toggles the HPD line, like FireHpdPulse() does. So it is not equivalent
+    to a series of Unplug() and Plug() calls:
+      - The EDID and DDC are set up once, in the same way as Plug() does,
+        and stay enabled during the low segments. A DUT may read the EDID
+        while HPD is low.
+      - They are turned off at the end only if HPD stops at low, as
+        Unplug() would leave them; if it stops at high, they stay enabled,
+        as Plug() would leave them.
+      - There is no retry per transition. A failure of hpd_control raises,
+        since retrying would fire the segments already fired again.
+
+    Args:
+      widths_msec: list of pulse segment widths in milli-second.
+
+    Raises:
+      InputFlowError if the widths are not supported by the FPGA HPD
+      controller.
+    """
+    widths_usec = [int(w * 1000) for w in widths_msec]
+    # Splitting a longer pattern across hpd_control invocations would stretch
+    # the low segments at the boundaries by a process spawn, which can turn
+    # a short IRQ_HPD pulse into an unplug.
+    if (not 0 < len(widths_usec) <= fpga.HpdController.MAX_MIXED_PULSE_SEGMENTS
+        or min(widths_usec) <= 0):
+      raise InputFlowError(
+          'HPD-only pulses need 1 to %d segments of positive widths' %
+          fpga.HpdController.MAX_MIXED_PULSE_SEGMENTS)
+
+    if self.IsEdidEnabled():
+      self._edid.Enable()
+    if self.IsDdcEnabled():
+      self._EnableDdc()
+    self._fpga.hpd.FireMixedHpdPulses(self._input_id, widths_usec)
+    if len(widths_usec) % 2 == 0:
+      self._edid.Disable()
+      self._DisableDdc()
+
   def _RunHpdToggle(self, port_id, rising_edge):
     logging.info('Run HPD %s toggle on port #%d',
                  'rising' if rising_edge  else 'falling', port_id)
@@ -1117,6 +1165,14 @@ class VgaInputFlow(FpgaInputFlow):
     # For VGA, block the RGB source to emulate unplug.
     self._mux_io.SetOutputMask(io.MuxIo.MASK_VGA_BLOCK_SOURCE)
 
+  def _FireMixedHpdPulsesByFpga(self, widths_msec):
+    """Fires HPD pulses of mixed widths using the FPGA HPD controller.
+
+    Raises:
+      InputFlowError, as VGA has no HPD line on the FPGA HPD controller.
+    """
+    raise InputFlowError('HPD-only pulses are not supported on VGA')
+
   def SetVgaMode(self, mode):
     """Sets the mode for VGA monitor."""
     if mode.lower() == 'auto':
@@ -43,6 +43,10 @@ class USBHIDFlow(chameleon_device.Flow):
     self._report_length = report_length
     self._bounce = bounce
     self._usb_ctrl = usb_ctrl
+    # Bind the event functions of Send() once, keyed by event type.
+    self._send_funcs = dict(
+        (event_type, getattr(self, func_name))
+        for event_type, func_name in self._SUPPORTED_EVENTS.iteritems())
 
   def IsDetected(self):
     """Returns if the device can be detected."""
@@ -125,12 +129,11 @@ class USBHIDFlow(chameleon_device.Flow):
     logging.info('HID flow #%d Event: Type=%s, Args=(%s)',
                  self._port_id, event_type, args_string)
 
-    if event_type.lower() in self.supported_events:
-      return getattr(
-          self, self._SUPPORTED_EVENTS[event_type.lower()])(*args, **kwargs)
-    else:
+    send_func = self._send_funcs.get(event_type.lower())
+    if send_func is None:
       raise USBHIDFlowError('Unsupported event_type "%s"!! Supported: %s' %
                             (event_type, str(self.supported_events)))
+    return send_func(*args, **kwargs)
 
   def _IsHIDFileExisted(self):
     """Checks if hid file is existed.
@@ -5,7 +5,7 @@
 """Chameleond Driver for FPGA customized platform with the TIO card."""
 
 import functools
-import glob
+import itertools
 import logging
 import os
 import time
@@ -25,6 +25,7 @@ from chameleond.devices import usb_audio_flow
 from chameleond.devices import usb_hid_flow
 from chameleond.devices import usb_printer_device
 from chameleond.utils import caching_server
+from chameleond.utils import common
 from chameleond.utils import device_manager
 from chameleond.utils import fpga
 from chameleond.utils import flow_manager
@@ -71,9 +72,29 @@ class ChameleondDriver(ChameleondInterface):
   _DEFAULT_FRAME_INDEX = 0
   _DEFAULT_FRAME_LIMIT = _DEFAULT_FRAME_INDEX + 1
 
+  # The flow functions returning the signals of the captured frames.
+  _SIGNAL_FUNC_NAMES = ('GetFrameHashes', 'GetHistograms')
+
+  _MAC_ADDRESS_PATH = '/sys/class/net/eth0/address'
+
+  # Directory and name prefixes of the temporary audio and printer files.
+  _TEMP_FILE_DIR = '/tmp'
+  _TEMP_FILE_PREFIXES = ('audio_', 'printer_')
+
   # Limit the period of async capture to 3min (in 60fps).
   _MAX_CAPTURED_FRAME_COUNT = 3 * 60 * 60
 
+  # Delay in second to check the captured frame count, using 120-fps.
+  _DELAY_CAPTURED_FRAME_COUNT_PROBE = 1.0 / 120
+
+  # Time to wait for the avsync monitoring process to finish by itself.
+  _TIMEOUT_AVSYNC_FINISH = 1.0
+  _DELAY_AVSYNC_FINISH_PROBE = 0.05
+
+  # Limit the raw size of the frames returned by a ReadCapturedFrames call,
+  # as they are held in memory and base64-encoded again for the XML-RPC reply.
+  _MAX_READ_FRAMES_SIZE = 64 * 1024 * 1024
+
   def __init__(self, *args, **kwargs):
     super(ChameleondDriver, self).__init__(*args, **kwargs)
 
@@ -81,6 +102,8 @@ class ChameleondDriver(ChameleondInterface):
     platform = kwargs.get('platform', 'fpga')
     self._captured_params = {}
     self._process = None
+    self._avsync_delay = None
+    self._mac_address = None
 
     logging.info("platform: %s", platform)
 
@@ -111,6 +134,12 @@ class ChameleondDriver(ChameleondInterface):
     self._device_manager = device_manager.DeviceManager(self._devices)
     self._device_manager.Init()
     self._flows = self._device_manager.GetDetectedFlows()
+    # Bind the signal functions of the captured frames once, keyed by
+    # (port_id, function name), for _GetCapturedSignals.
+    self._signal_funcs = dict(
+        ((port_id, name), getattr(flow, name))
+        for port_id, flow in self._flows.iteritems()
+        for name in self._SIGNAL_FUNC_NAMES if hasattr(flow, name))
 
     # Allow to access the methods through object.
     # Hence, there is no need to export the methods in ChameleondDriver.
@@ -189,8 +218,7 @@ class ChameleondDriver(ChameleondInterface):
     self._flow_manager.Reset()
     self._device_manager.Reset()
 
-    self._ClearAudioFiles()
-    self._ClearPrinterFiles()
+    self._ClearTemporaryFiles()
     caching_server.ClearCachedDir()
 
   def Reboot(self):
@@ -456,7 +484,7 @@ class ChameleondDriver(ChameleondInterface):
         port_id, deassert_interval_usec, assert_interval_usec, repeat_count,
         end_level)
 
-  def FireMixedHpdPulses(self, port_id, widths_msec):
+  def FireMixedHpdPulses(self, port_id, widths_msec, hpd_only=False):
     """Fires one or more HPD pulses, starting at low, of mixed widths.
 
     One must specify a list of segment widths in the widths_msec argument where
@@ -466,14 +494,21 @@ class ChameleondDriver(ChameleondInterface):
     The HPD line stops at low if even number of segment widths are specified;
     otherwise, it stops at high.
 
-    The method is equivalent to a series of calls to Unplug() and Plug()
-    separated by specified pulse widths.
+    By default, the method is equivalent to a series of calls to Unplug() and
+    Plug() separated by specified pulse widths. With hpd_only, the whole
+    pattern is fired by the FPGA HPD controller, which only toggles the HPD
+    line, as FireHpdPulse() does on DP and HDMI: the EDID and DDC stay enabled
+    during the low segments and no transition is retried. It supports the DP
+    and HDMI ports, and up to 20 segments of positive widths.
 
     Args:
       port_id: The ID of the video input port.
       widths_msec: list of pulse segment widths in milli-second.
+      hpd_only: True to only toggle the HPD line by the FPGA HPD controller;
+                False to call Unplug() and Plug().
     """
-    return self._flow_manager.FireMixedHpdPulses(port_id, widths_msec)
+    return self._flow_manager.FireMixedHpdPulses(port_id, widths_msec,
+                                                 hpd_only)
 
   def ScheduleHpdToggle(self, port_id, delay_ms, rising_edge):
     """Schedules one HPD Toggle, with a delay between the toggle.
@@ -528,6 +563,7 @@ class ChameleondDriver(ChameleondInterface):
       chameleon.StopCapturingAudio(hdmi_input)
       delay = chameleon.GetAudioVideoCapturingDelay()
     """
+    self._avsync_delay = None
     self._process = system_tools.SystemTools.RunInSubprocess('avsync')
 
   def GetAudioVideoCapturingDelay(self):
@@ -541,8 +577,17 @@ class ChameleondDriver(ChameleondInterface):
     Raises:
       DriverError if there is no output from the monitoring process.
     """
-
-    if self._process.poll() is None:
+    # The output of the process can be read only once.
+    if self._avsync_delay is not None:
+      return self._avsync_delay
+
+    # Give the process a short grace period to finish, instead of killing it
+    # if it is about to complete.
+    try:
+      common.WaitForCondition(lambda: self._process.poll() is not None, True,
+                              self._DELAY_AVSYNC_FINISH_PROBE,
+                              self._TIMEOUT_AVSYNC_FINISH)
+    except common.TimeoutError:
       self._process.terminate()
       raise DriverError('The monitoring process has not finished.')
 
@@ -555,7 +600,8 @@ class ChameleondDriver(ChameleondInterface):
     if not out:
       raise DriverError('No output from the monitoring process.')
 
-    return float(out)
+    self._avsync_delay = float(out)
+    return self._avsync_delay
 
   def DumpPixels(self, port_id, x=None, y=None, width=None, height=None):
     """Dumps the raw pixel array of the selected area.
@@ -574,7 +620,10 @@ class ChameleondDriver(ChameleondInterface):
     """
     x, y, width, height = self._AutoFillArea(port_id, x, y, width, height)
     self.CaptureVideo(port_id, self._DEFAULT_FRAME_LIMIT, x, y, width, height)
-    return self.ReadCapturedFrame(self._DEFAULT_FRAME_INDEX)
+    # CaptureVideo returns only after the frame is dumped, so read it from
+    # the flow without validating the range against the frame count again.
+    return xmlrpclib.Binary(
+        self._flows[port_id].ReadCapturedFrame(self._DEFAULT_FRAME_INDEX))
 
   def _AutoFillArea(self, port_id, x, y, width, height):
     """Verifies the area argument correctness and fills the default values.
@@ -685,8 +734,11 @@ class ChameleondDriver(ChameleondInterface):
         raise DriverError('Exceeded the limit of capture, stop_index >= %d' %
                           self._MAX_CAPTURED_FRAME_COUNT)
       logging.info('Waiting the captured frame count reaches %d...', stop_index)
+      # The frame count is updated by the process which monitors fields.
+      # Don't spin on it, which contends for the shared counter and steals
+      # the CPU from that process.
       while self.GetCapturedFrameCount() < stop_index:
-        pass
+        time.sleep(self._DELAY_CAPTURED_FRAME_COUNT_PROBE)
 
     self._flow_manager.StopDumpingFrames(port_id)
     logging.info('Stopped capturing video from port #%d', port_id)
@@ -721,8 +773,8 @@ class ChameleondDriver(ChameleondInterface):
     self._PrepareCapturingVideo(port_id, x, y, width, height)
     max_frame_limit = self._captured_params['max_frame_limit']
     if total_frame > max_frame_limit:
-      raise DriverError('Exceed the max frame limit %d > %d',
-                        total_frame, max_frame_limit)
+      raise DriverError('Exceed the max frame limit %d > %d' %
+                        (total_frame, max_frame_limit))
 
     # TODO(waihong): Make the timeout value based on the FPS rate.
     self._flow_manager.DumpFramesToLimit(
@@ -760,20 +812,83 @@ class ChameleondDriver(ChameleondInterface):
       A byte-array of the pixels, wrapped in a xmlrpclib.Binary object.
     """
     port_id = self._captured_params['port_id']
-    total_frame = self.GetCapturedFrameCount()
-    max_frame_limit = self._captured_params['max_frame_limit']
-    # The captured frames are store in a circular buffer. Only the latest
-    # max_frame_limit frames are valid.
-    first_valid_index = max(0, total_frame - max_frame_limit)
+    first_valid_index, total_frame = self._GetValidFrameRange(port_id)
     if not first_valid_index <= frame_index < total_frame:
       raise DriverError('The frame index is out-of-range: %d not in [%d, %d)' %
                         (frame_index, first_valid_index, total_frame))
 
-    # Use the projected index.
-    frame_index = frame_index % max_frame_limit
-    screen = self._flow_manager.ReadCapturedFrame(port_id, frame_index)
+    screen = self._flow_manager.ReadCapturedFrame(
+        port_id, self._ProjectFrameIndex(frame_index))
     return xmlrpclib.Binary(screen)
 
+  def ReadCapturedFrames(self, start_index, stop_index):
+    """Reads the content of the captured frames from the buffer.
+
+    It validates the range once and reads all the frames in a single call,
+    instead of a ReadCapturedFrame call per frame.
+
+    Args:
+      start_index: The index of the start frame.
+      stop_index: The index of the stop frame (excluded).
+
+    Returns:
+      A list of byte-arrays of the pixels, each wrapped in a xmlrpclib.Binary
+      object.
+
+    Raises:
+      DriverError if the range is invalid or the frames in it exceed
+      _MAX_READ_FRAMES_SIZE bytes.
+    """
+    port_id = self._captured_params['port_id']
+    first_valid_index, total_frame = self._GetValidFrameRange(port_id)
+    if not first_valid_index <= start_index < total_frame:
+      raise DriverError('The start index is out-of-range: %d not in [%d, %d)' %
+                        (start_index, first_valid_index, total_frame))
+    if not start_index < stop_index <= total_frame:
+      raise DriverError('The stop index is out-of-range: %d not in (%d, %d]' %
+                        (stop_index, start_index, total_frame))
+    width, height = self._flow_manager.GetCapturedResolution(port_id)
+    read_size = width * height * 3 * (stop_index - start_index)
+    if read_size > self._MAX_READ_FRAMES_SIZE:
+      raise DriverError('Too many frames to read at once: %d bytes > %d bytes' %
+                        (read_size, self._MAX_READ_FRAMES_SIZE))
+
+    # The port was validated when the capture was prepared. Read the frames
+    # through the flow directly, not the decorated FlowManager per frame.
+    read_frame = self._flows[port_id].ReadCapturedFrame
+    return [xmlrpclib.Binary(read_frame(self._ProjectFrameIndex(frame_index)))
+            for frame_index in xrange(start_index, stop_index)]
+
+  def _GetValidFrameRange(self, port_id):
+    """Gets the range of the captured frames which are still in the buffer.
+
+    The captured frames are store in a circular buffer. Only the latest
+    max_frame_limit frames are valid.
+
+    Args:
+      port_id: The ID of the video input port.
+
+    Returns:
+      A (first_valid_index, total_frame) tuple; the valid range is
+      [first_valid_index, total_frame).
+    """
+    total_frame = self._flow_manager.GetDumpedFrameCount(port_id)
+    first_valid_index = total_frame - self._captured_params['max_frame_limit']
+    if first_valid_index < 0:
+      first_valid_index = 0
+    return first_valid_index, total_frame
+
+  def _ProjectFrameIndex(self, frame_index):
+    """Projects the frame index to the index in the circular buffer.
+
+    Args:
+      frame_index: The index of the captured frame.
+
+    Returns:
+      The index in the circular buffer.
+    """
+    return frame_index % self._captured_params['max_frame_limit']
+
   def CacheFrameThumbnail(self, frame_index, ratio=2):
     """Caches the thumbnail of the dumped field to a temp file.
 
@@ -787,6 +902,32 @@ class ChameleondDriver(ChameleondInterface):
     port_id = self._captured_params['port_id']
     return self._flow_manager.CacheFrameThumbnail(port_id, frame_index, ratio)
 
+  def CacheCapturedFrame(self, frame_index):
+    """Caches the content of the captured frame to a temp file.
+
+    The file is served by the caching server, on the port next to the RPC
+    server, and removed once it is fetched. Unlike ReadCapturedFrame, the
+    pixels are transferred as-is, not base64-encoded in the RPC response.
+
+    Args:
+      frame_index: The index of the frame to cache.
+
+    Returns:
+      An ID to identify the cached frame.
+    """
+    port_id = self._captured_params['port_id']
+    first_valid_index, total_frame = self._GetValidFrameRange(port_id)
+    if not first_valid_index <= frame_index < total_frame:
+      raise DriverError('The frame index is out-of-range: %d not in [%d, %d)' %
+                        (frame_index, first_valid_index, total_frame))
+
+    screen = self._flows[port_id].ReadCapturedFrame(
+        self._ProjectFrameIndex(frame_index))
+    file_name = 'frame_%05d' % frame_index
+    with open(os.path.join(caching_server.CACHED_DIR, file_name), 'wb') as f:
+      f.write(screen)
+    return file_name
+
   def _GetCapturedSignals(self, signal_func_name, start_index=0,
                           stop_index=None):
     """Gets the list of signals of the captured frames.
@@ -801,7 +942,7 @@ class ChameleondDriver(ChameleondInterface):
       The list of signals.
     """
     port_id = self._captured_params['port_id']
-    total_frame = self.GetCapturedFrameCount()
+    total_frame = self._flow_manager.GetDumpedFrameCount(port_id)
     if stop_index is None:
       stop_index = total_frame
     if not 0 <= start_index < total_frame:
@@ -810,7 +951,9 @@ class ChameleondDriver(ChameleondInterface):
     if not 0 < stop_index <= total_frame:
       raise DriverError('The stop index is out-of-range: %d not in (0, %d]' %
                         (stop_index, total_frame))
-    signal_func = getattr(self._flows[port_id], signal_func_name)
+    # The flow returns the whole range from a single read of the saved
+    # signals; see FieldManager._SplitSavedSignals.
+    signal_func = self._signal_funcs[port_id, signal_func_name]
     return signal_func(start_index, stop_index)
 
   def GetCapturedChecksums(self, start_index=0, stop_index=None):
@@ -857,8 +1000,10 @@ class ChameleondDriver(ChameleondInterface):
     """
     x, y, width, height = self._AutoFillArea(port_id, x, y, width, height)
     self.CaptureVideo(port_id, self._DEFAULT_FRAME_LIMIT, x, y, width, height)
-    return self.GetCapturedChecksums(self._DEFAULT_FRAME_INDEX,
-                                     self._DEFAULT_FRAME_INDEX + 1)[0]
+    # CaptureVideo returns only after the frame is dumped, so read its hash
+    # without validating the range against the frame count again.
+    return self._signal_funcs[port_id, 'GetFrameHashes'](
+        self._DEFAULT_FRAME_INDEX, self._DEFAULT_FRAME_INDEX + 1)[0]
 
   def DetectResolution(self, port_id):
     """Detects the video source resolution.
@@ -1046,23 +1191,17 @@ class ChameleondDriver(ChameleondInterface):
     """
     self._flow_manager.StopPlayingAudio(port_id)
 
-  def _ClearPrinterFiles(self):
-    """Clears temporary printer files.
-
-    Chameleon board does not reboot very often. We should clear the temporary
-    printer files used in capturing printer data.
-    """
-    for path in glob.glob('/tmp/printer_*'):
-      os.unlink(path)
-
-  def _ClearAudioFiles(self):
-    """Clears temporary audio files.
+  def _ClearTemporaryFiles(self):
+    """Clears temporary audio and printer files.
 
     Chameleon board does not reboot very often. We should clear the temporary
-    audio files used in capturing audio or playing audio when Reset is called.
+    audio files used in capturing audio or playing audio, and the temporary
+    printer files used in capturing printer data, when Reset is called.
+    Both are in the same directory, so scan it only once.
     """
-    for path in glob.glob('/tmp/audio_*'):
-      os.unlink(path)
+    for file_name in os.listdir(self._TEMP_FILE_DIR):
+      if file_name.startswith(self._TEMP_FILE_PREFIXES):
+        os.unlink(os.path.join(self._TEMP_FILE_DIR, file_name))
 
   @_DeviceMethod(ids.AUDIO_BOARD)
   def AudioBoardConnect(self, bus_number, endpoint):
@@ -1118,12 +1257,9 @@ class ChameleondDriver(ChameleondInterface):
       audio_board.AudioBusEndpoint.
     """
     sources, sinks = self.audio_board.GetConnections(bus_number)
-    routes = []
-    for source in sources:
-      for sink in sinks:
-        logging.info('Route on bus %d: %s ---> %s',
-                     bus_number, source, sink)
-        routes.append((source, sink))
+    routes = list(itertools.product(sources, sinks))
+    logging.info('Routes on bus %d: %s', bus_number,
+                 ', '.join('%s ---> %s' % route for route in routes))
     return routes
 
   @_DeviceMethod(ids.AUDIO_BOARD)
@@ -1215,7 +1351,11 @@ class ChameleondDriver(ChameleondInterface):
     Returns:
       A string for MAC address.
     """
-    return open('/sys/class/net/eth0/address').read().strip()
+    # The MAC address does not change at runtime; read sysfs only once.
+    if self._mac_address is None:
+      with open(self._MAC_ADDRESS_PATH) as f:
+        self._mac_address = f.read().strip()
+    return self._mac_address
 
   def SendHIDEvent(self, port_id, event_type, *args, **kwargs):
     """Sends HID event with event_type and arguments for HID port #port_id.
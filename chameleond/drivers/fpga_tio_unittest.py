@@ -0,0 +1,62 @@
+#!/usr/bin/env python
+# Copyright 2017 The Chromium OS Authors. All rights reserved.
+# Use of this source code is governed by a BSD-style license that can be
+# found in the LICENSE file.
+"""Unit tests for the fpga_tio module."""
+
+import unittest
+
+import chameleon_common  # pylint: disable=W0611
+from chameleond.drivers import fpga_tio
+from chameleond.utils import ids
+
+
+class FakeFlowManager(object):
+  """A fake FlowManager which has captured some 1080p frames."""
+
+  def __init__(self, dumped_frame_count):
+    self._dumped_frame_count = dumped_frame_count
+
+  def GetDumpedFrameCount(self, unused_port_id):
+    return self._dumped_frame_count
+
+  def GetCapturedResolution(self, unused_port_id):
+    return (1920, 1080)
+
+
+class FakeInputFlow(object):
+  """A fake input flow which returns the frame index as the frame content."""
+
+  def ReadCapturedFrame(self, frame_index):
+    return str(frame_index)
+
+
+class ReadCapturedFramesTest(unittest.TestCase):
+  """Tests ChameleondDriver.ReadCapturedFrames."""
+
+  _FRAME_SIZE = 1920 * 1080 * 3
+  _MAX_FRAME_COUNT = (fpga_tio.ChameleondDriver._MAX_READ_FRAMES_SIZE /
+                      _FRAME_SIZE)
+
+  def setUp(self):
+    # Skip __init__, which probes the hardware.
+    self.driver = object.__new__(fpga_tio.ChameleondDriver)
+    self.driver._flow_manager = FakeFlowManager(self._MAX_FRAME_COUNT + 1)
+    self.driver._flows = {ids.HDMI: FakeInputFlow()}
+    self.driver._captured_params = {
+        'port_id': ids.HDMI,
+        'max_frame_limit': self._MAX_FRAME_COUNT + 1,
+    }
+
+  def testReadWithinLimit(self):
+    frames = self.driver.ReadCapturedFrames(0, self._MAX_FRAME_COUNT)
+    self.assertEqual([str(i) for i in xrange(self._MAX_FRAME_COUNT)],
+                     [frame.data for frame in frames])
+
+  def testReadOverLimit(self):
+    self.assertRaises(fpga_tio.DriverError, self.driver.ReadCapturedFrames,
+                      0, self._MAX_FRAME_COUNT + 1)
+
+
+if __name__ == '__main__':
+  unittest.main()
@@ -275,7 +275,7 @@ class ChameleondInterface(object):
     """
     raise NotImplementedError('FireHpdPulse')
 
-  def FireMixedHpdPulses(self, port_id, widths_msec):
+  def FireMixedHpdPulses(self, port_id, widths_msec, hpd_only=False):
     """Fires one or more HPD pulses, starting at low, of mixed widths.
 
     One must specify a list of segment widths in the widths_msec argument where
@@ -285,12 +285,18 @@ class ChameleondInterface(object):
     The HPD line stops at low if even number of segment widths are specified;
     otherwise, it stops at high.
 
-    The method is equivalent to a series of calls to Unplug() and Plug()
-    separated by specified pulse widths.
+    By default, the method is equivalent to a series of calls to Unplug() and
+    Plug() separated by specified pulse widths. With hpd_only, the whole
+    pattern is fired by the FPGA HPD controller, which only toggles the HPD
+    line, as FireHpdPulse() does on DP and HDMI: the EDID and DDC stay enabled
+    during the low segments and no transition is retried. It supports the DP
+    and HDMI ports, and up to 20 segments of positive widths.
 
     Args:
       port_id: The ID of the video input port.
       widths_msec: list of pulse segment widths in milli-second.
+      hpd_only: True to only toggle the HPD line by the FPGA HPD controller;
+                False to call Unplug() and Plug().
     """
     raise NotImplementedError('FireMixedHpdPulses')
 
@@ -459,6 +465,22 @@ class ChameleondInterface(object):
     """
     raise NotImplementedError('ReadCapturedFrame')
 
+  def ReadCapturedFrames(self, start_index, stop_index):
+    """Reads the content of the captured frames from the buffer.
+
+    The total size of the frames is limited; read a long range in several
+    calls.
+
+    Args:
+      start_index: The index of the start frame.
+      stop_index: The index of the stop frame (excluded).
+
+    Returns:
+      A list of byte-arrays of the pixels, each wrapped in a xmlrpclib.Binary
+      object.
+    """
+    raise NotImplementedError('ReadCapturedFrames')
+
   def CacheFrameThumbnail(self, frame_index, ratio=2):
     """Caches the thumbnail of the dumped field to a temp file.
 
@@ -471,6 +493,20 @@ class ChameleondInterface(object):
     """
     raise NotImplementedError('CacheFrameThumbnail')
 
+  def CacheCapturedFrame(self, frame_index):
+    """Caches the content of the captured frame to a temp file.
+
+    The file is served by the caching server, on the port next to the RPC
+    server, and removed once it is fetched.
+
+    Args:
+      frame_index: The index of the frame to cache.
+
+    Returns:
+      An ID to identify the cached frame.
+    """
+    raise NotImplementedError('CacheCapturedFrame')
+
   def GetCapturedChecksums(self, start_index=0, stop_index=None):
     """Gets the list of checksums of the captured frames.
 
@@ -5,7 +5,6 @@
 
 import logging
 import os
-import struct
 
 import chameleon_common  # pylint: disable=W0611
 from chameleond.utils import fpga
@@ -186,7 +185,9 @@ class AudioStreamManager(object):
   def _CopyDataToMemory(self, data):
     """Copies audio data to memory.
 
-    Appends zeros to audio data so its size becomes a multiple of page size.
+    Pads zeros after audio data so its size becomes a multiple of page size.
+    The zeros are filled to memory separately, to avoid copying the data
+    into a padded string first.
     Copies audio data to memory allocated for streaming, which starts
     from _stream.mapped_start_address with size
     _stream.MAX_STREAM_BUFFER_SIZE.
@@ -201,32 +202,19 @@ class AudioStreamManager(object):
       AudioStreamManagerError: If size of appended data is larger than
         self._stream.MAX_STREAM_BUFFER_SIZE.
     """
-    data = AppendZeroToFitPageSize(data, self._stream.PAGE_SIZE)
-    if len(data) > self._stream.MAX_STREAM_BUFFER_SIZE:
+    data_size = len(data)
+    padding_size = -data_size % self._stream.PAGE_SIZE
+    size = data_size + padding_size
+    if size > self._stream.MAX_STREAM_BUFFER_SIZE:
       raise AudioStreamManagerError(
           'audio data is larger than %r bytes' %
           self._stream.MAX_STREAM_BUFFER_SIZE)
-    logging.info('Fill 0x%x bytes data to memory 0x%x',
-                 len(data), self._stream.mapped_start_address)
-    self._memory.Fill(self._stream.mapped_start_address, data)
-    return len(data)
-
-
-def AppendZeroToFitPageSize(data, page_size):
-  """Appends data such that it is a multiple of page size.
-
-  Args:
-    data: The data to be appended.
-    page_size: Page size in bytes.
-
-  Returns:
-    The appended result.
-  """
-  offset = len(data) % page_size
-  if offset == 0:
-    return data
-  append_size = page_size - offset
-  return data + struct.pack('<b', 0) * append_size
+    address = self._stream.mapped_start_address
+    logging.info('Fill 0x%x bytes data to memory 0x%x', size, address)
+    self._memory.Fill(address, data)
+    if padding_size:
+      self._memory.Fill(address + data_size, '\0' * padding_size)
+    return size
 
 
 class AudioRouteManagerError(Exception):
@@ -154,6 +154,23 @@ class IoExpander(i2c.I2cSlave):
     else:
       self.ClearOutputMask(mask)
 
+  def SetBits(self, mask, value):
+    """Sets the masked bits as output and sets their values to 1 or 0.
+
+    It takes the same bus transactions as SetBit, no matter how many bits
+    are in the mask.
+
+    Args:
+      mask: The bitwise mask of the bits to set.
+      value: 1 or 0, for all the masked bits.
+    """
+    # 0 means output in SetDirection.
+    self.SetDirection(self._GetDirection() & ~mask & 0xffff)
+    if value:
+      self.SetOutputMask(mask)
+    else:
+      self.ClearOutputMask(mask)
+
   def ReadBit(self, offset):
     """Sets a bit as input and reads its value.
 
@@ -5,7 +5,6 @@
 
 import logging
 import os
-import tempfile
 from multiprocessing import Process, Value, Array
 
 import chameleon_common  # pylint: disable=W0611
@@ -13,6 +12,7 @@ from chameleond.utils import caching_server
 from chameleond.utils import common
 from chameleond.utils import fpga
 from chameleond.utils import ids
+from chameleond.utils import mem
 from chameleond.utils import system_tools
 
 
@@ -38,6 +38,9 @@ class FieldManager(object):
 
   # Delay in second to check the field count, using 120-fps.
   _DELAY_VIDEO_DUMP_PROBE = 1.0 / 120
+  # Delay in second to check the field count only, which is a single
+  # register read.
+  _DELAY_FIELD_COUNT_PROBE = 0.001
 
   def __init__(self, input_id, vdumps):
     """Constructs a FieldManager object.
@@ -57,6 +60,15 @@ class FieldManager(object):
     self._timeout_in_field = None
     self._process = None
     self._dimension = (0, 0)
+    self._memory = mem.MemoryForDumper
+    # The start addresses of the dump buffers, a single one on
+    # single-pixel-mode and two on dual-pixel-mode, and the page-aligned size
+    # of a field in them, saved on setting up the field dump.
+    self._dump_addresses = [
+        arg for arg in fpga.VideoDumper.GetPixelDumpArgs(input_id,
+                                                         self._is_dual)
+        if isinstance(arg, (int, long))]
+    self._field_size = 0
 
   def ComputeResolution(self):
     """Computes the resolution from FPGA."""
@@ -123,6 +135,11 @@ class FieldManager(object):
 
     # Save the dimension of fields.
     self._dimension = (width, height)
+    PAGE_SIZE = 4096
+    PIXEL_LEN = 3
+    band_width = width / 2 if self._is_dual else width
+    field_size = band_width * height * PIXEL_LEN
+    self._field_size = ((field_size - 1) / PAGE_SIZE + 1) * PAGE_SIZE
 
     for vdump in self._vdumps:
       vdump.SetDumpAddressForCapture()
@@ -135,17 +152,20 @@ class FieldManager(object):
         else:
           vdump.EnableCrop(x, y, width, height)
 
-  def _ComputeFieldHash(self, index):
-    """Computes the field hash of the given field index, from FPGA.
+  def _ComputeFieldHashes(self, start, stop):
+    """Computes the field hashes of the given range of field indexes, from FPGA.
+
+    Only the hash values of the range are read from each VideoDumper.
 
     Returns:
-      A list of hash16 values, i.e. a single field hash.
+      A list of field hashes.
     """
-    hashes = [vdump.GetFieldHash(index, self._is_dual)
+    hashes = [vdump.GetFieldHashes(start, stop, self._is_dual)
               for vdump in self._vdumps]
     if self._is_dual:
       # [Odd MSB, Even MSB, Odd LSB, Odd LSB]
-      return [hashes[1][0], hashes[0][0], hashes[1][1], hashes[0][1]]
+      return [[odd[0], even[0], odd[1], even[1]]
+              for even, odd in zip(hashes[0], hashes[1])]
     else:
       return hashes[0]
 
@@ -159,11 +179,10 @@ class FieldManager(object):
     Returns:
       A list of field hashes.
     """
-    # Convert to a list, in which each element is a field hash.
-    return [self._saved_hashes[i : i + self._HASH_SIZE]
-            for i in xrange(start * self._HASH_SIZE,
-                            stop * self._HASH_SIZE,
-                            self._HASH_SIZE)]
+    # Slice the shared array once, then convert to a list, in which each
+    # element is a field hash.
+    return self._SplitSavedSignals(self._saved_hashes, self._HASH_SIZE,
+                                   start, stop)
 
   def GetFieldCount(self):
     """Returns the saved number of field dumped."""
@@ -191,10 +210,7 @@ class FieldManager(object):
       width = width / 2
 
     # Modify the memory offset to match the field.
-    PAGE_SIZE = 4096
-    PIXEL_LEN = 3
-    field_size = width * height * PIXEL_LEN
-    field_size = ((field_size - 1) / PAGE_SIZE + 1) * PAGE_SIZE
+    field_size = self._field_size
     offset_args = ['-g', self._GRID_NUM, '-s', self._GRID_SAMPLE_NUM]
     # The histogram is computed by sampled pixels. Getting one band is enough
     # even if it is in dual pixel mode.
@@ -221,10 +237,29 @@ class FieldManager(object):
     Returns:
       A list of histograms.
     """
-    return [self._saved_histograms[i : i + self._HISTOGRAM_SIZE]
-            for i in xrange(start * self._HISTOGRAM_SIZE,
-                            stop * self._HISTOGRAM_SIZE,
-                            self._HISTOGRAM_SIZE)]
+    return self._SplitSavedSignals(self._saved_histograms,
+                                   self._HISTOGRAM_SIZE, start, stop)
+
+  @staticmethod
+  def _SplitSavedSignals(saved_signals, signal_size, start, stop):
+    """Splits the saved signals of the given fields into a list.
+
+    The shared array takes its lock on every access. Read the whole range in
+    a single slice and split the local copy, instead of slicing the shared
+    array once per field.
+
+    Args:
+      saved_signals: The shared array of the saved signals.
+      signal_size: The number of elements of a signal of a field.
+      start: The index of the start field.
+      stop: The index of the stop field (excluded).
+
+    Returns:
+      A list of signals, one per field.
+    """
+    signals = saved_signals[start * signal_size : stop * signal_size]
+    return [signals[i : i + signal_size]
+            for i in xrange(0, len(signals), signal_size)]
 
   def ReadDumpedField(self, field_index):
     """Reads the content of the dumped field from the buffer."""
@@ -233,23 +268,25 @@ class FieldManager(object):
       width = width / 2
 
     # Modify the memory offset to match the field.
-    PAGE_SIZE = 4096
     PIXEL_LEN = 3
-    field_size = width * height * PIXEL_LEN
-    field_size = ((field_size - 1) / PAGE_SIZE + 1) * PAGE_SIZE
-    offset = field_size * field_index
-    offset_args = []
-    for arg in fpga.VideoDumper.GetPixelDumpArgs(self._input_id, self._is_dual):
-      if isinstance(arg, (int, long)):
-        offset_args.append(arg + offset)
-      else:
-        offset_args.append(arg)
-    logging.info('pixeldump args %r', offset_args)
-
-    with tempfile.NamedTemporaryFile() as f:
-      system_tools.SystemTools.Call(
-          'pixeldump', f.name, width, height, PIXEL_LEN, *offset_args)
-      return f.read()
+    offset = self._field_size * field_index
+    addresses = [address + offset for address in self._dump_addresses]
+    logging.debug('Read dumped field #%d at offset 0x%x', field_index, offset)
+
+    # Read the buffers directly from the mmapped dump memory, instead of
+    # running pixeldump to copy them through a temporary file.
+    size = width * height * PIXEL_LEN
+    buffers = [self._memory.ReadBytes(address, size) for address in addresses]
+    if len(buffers) == 1:
+      return buffers[0]
+
+    # On dual-pixel-mode, interleave the pixels of the even and odd buffers,
+    # the same as pixeldump does.
+    pixels = bytearray(size * 2)
+    for i in xrange(PIXEL_LEN):
+      pixels[i::PIXEL_LEN * 2] = buffers[0][i::PIXEL_LEN]
+      pixels[PIXEL_LEN + i::PIXEL_LEN * 2] = buffers[1][i::PIXEL_LEN]
+    return str(pixels)
 
   def CacheFieldThumbnail(self, field_index, ratio):
     """Caches the thumbnail of the dumped field to a temp file.
@@ -276,15 +313,11 @@ class FieldManager(object):
       single_band_width = original_width
 
     # Modify the memory offset to match the field.
-    PAGE_SIZE = 4096
     PIXEL_LEN = 3
-    field_size = single_band_width * original_height * PIXEL_LEN
-    field_size = ((field_size - 1) / PAGE_SIZE + 1) * PAGE_SIZE
-
     max_limit = fpga.VideoDumper.GetMaxFieldLimit(single_band_width,
                                                   original_height)
     offset_addr = fpga.VideoDumper.GetPixelDumpArgs(self._input_id, False)[1]
-    offset_addr += field_size * (field_index % max_limit)
+    offset_addr += self._field_size * (field_index % max_limit)
 
     file_name = 'tn_%05d' % field_index
     file_path = os.path.join(caching_server.CACHED_DIR, file_name)
@@ -314,21 +347,22 @@ class FieldManager(object):
     if current_field > self._last_field.value:
       start = self._last_field.value
       stop = current_field
-      for i in xrange(start, stop):
-        hash64 = self._ComputeFieldHash(i)
-        for j in xrange(self._HASH_SIZE):
-          self._saved_hashes[i * self._HASH_SIZE + j] = hash64[j]
-        logging.debug(
-            'Saved field hash #%d: %r', i,
-            self._saved_hashes[i * self._HASH_SIZE : (i + 1) * self._HASH_SIZE])
+      hashes = self._ComputeFieldHashes(start, stop)
+      for i, hash64 in enumerate(hashes, start):
+        self._saved_hashes[
+            i * self._HASH_SIZE : (i + 1) * self._HASH_SIZE] = hash64
+        logging.debug('Saved field hash #%d: %r', i, hash64)
 
       histograms = self._ComputeHistograms(start, stop)
+      # Formatting a histogram is not lazy; only do it for debugging.
+      is_debugging = logging.getLogger().isEnabledFor(logging.DEBUG)
       for i, h in enumerate(histograms):
         self._saved_histograms[
             (start + i) * self._HISTOGRAM_SIZE :
             (start + i + 1) * self._HISTOGRAM_SIZE] = h
-        logging.debug('Saved histogram #%d: %s', start + i,
-                      ', '.join(['%.02f' % v for v in h]))
+        if is_debugging:
+          logging.debug('Saved histogram #%d: %s', start + i,
+                        ', '.join(['%.02f' % v for v in h]))
 
       self._last_field.value = current_field
     return current_field >= field_count
@@ -390,7 +424,17 @@ class FieldManager(object):
     self._SetupFieldDump(field_buffer_limit, x, y, width, height, loop=False)
     self._StartFieldDump()
     self._CreateSavedHashes(field_buffer_limit)
-    self._WaitForFieldCount(field_buffer_limit, timeout)
+    if field_buffer_limit > fpga.VideoDumper.GetMaxHashLimit(self._is_dual):
+      self._WaitForFieldCount(field_buffer_limit, timeout)
+      return
+
+    # The hash buffer holds the hashes of all the fields. Only poll the field
+    # count, which is cheap, and save the hashes and the histograms once.
+    self._last_field.value = 0
+    func = lambda: self._ComputeFieldCount() >= field_buffer_limit
+    func.__name__ = 'HasFieldCountAtLeast%d' % field_buffer_limit
+    common.WaitForCondition(func, True, self._DELAY_FIELD_COUNT_PROBE, timeout)
+    self._HasFieldsDumpedAtLeast(field_buffer_limit)
 
   def StartDumpingFields(self, field_buffer_limit, x, y, width, height,
                          hash_buffer_limit):
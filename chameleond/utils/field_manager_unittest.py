@@ -0,0 +1,61 @@
+#!/usr/bin/env python
+# Copyright 2017 The Chromium OS Authors. All rights reserved.
+# Use of this source code is governed by a BSD-style license that can be
+# found in the LICENSE file.
+"""Unit tests for the field_manager module."""
+
+import unittest
+
+import chameleon_common  # pylint: disable=W0611
+from chameleond.utils import field_manager
+from chameleond.utils import ids
+
+
+class FakeVideoDumper(object):
+  """A fake VideoDumper which records the crop settings."""
+
+  def __init__(self):
+    self.crop = None
+
+  def SetDumpAddressForCapture(self):
+    pass
+
+  def SetFieldLimit(self, unused_field_limit, unused_loop):
+    pass
+
+  def EnableCrop(self, x, y, width, height):
+    self.crop = (x, y, width, height)
+
+  def DisableCrop(self):
+    self.crop = None
+
+
+class SetupFieldDumpTest(unittest.TestCase):
+  """Tests FieldManager._SetupFieldDump."""
+
+  def _SetupFieldDump(self, vdump_count, x, y, width, height):
+    vdumps = [FakeVideoDumper() for _ in xrange(vdump_count)]
+    manager = field_manager.FieldManager(ids.HDMI, vdumps)
+    manager._SetupFieldDump(1, x, y, width, height, loop=False)
+    return manager, vdumps
+
+  def testCropOnDualPixelMode(self):
+    manager, vdumps = self._SetupFieldDump(2, 32, 8, 1920, 1080)
+    for vdump in vdumps:
+      self.assertEqual((16, 8, 960, 1080), vdump.crop)
+    self.assertEqual((1920, 1080), manager.GetDumpedDimension())
+    self.assertEqual(0x2f8000, manager._field_size)
+
+  def testCropOnSinglePixelMode(self):
+    manager, vdumps = self._SetupFieldDump(1, 16, 8, 1920, 1080)
+    self.assertEqual((16, 8, 1920, 1080), vdumps[0].crop)
+    self.assertEqual(0x5ef000, manager._field_size)
+
+  def testFullScreen(self):
+    _, vdumps = self._SetupFieldDump(2, None, None, 1920, 1080)
+    for vdump in vdumps:
+      self.assertIsNone(vdump.crop)
+
+
+if __name__ == '__main__':
+  unittest.main()
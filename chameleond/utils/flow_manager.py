@@ -5,6 +5,7 @@
 """A manager for all flow based chameleon devices."""
 
 import functools
+import heapq
 import logging
 import os
 import xmlrpclib
@@ -17,6 +18,17 @@ class FlowManagerError(Exception):
   pass
 
 
+# Port groups used by the decorators below, which wrap every RPC. Keep them
+# as frozensets so the membership checks are hash lookups.
+_INPUT_PORTS = frozenset(ids.INPUT_PORTS)
+_OUTPUT_PORTS = frozenset(ids.OUTPUT_PORTS)
+_AUDIO_PORTS = frozenset(ids.AUDIO_PORTS)
+_AUDIO_INPUT_PORTS = _AUDIO_PORTS & _INPUT_PORTS
+_AUDIO_OUTPUT_PORTS = _AUDIO_PORTS & _OUTPUT_PORTS
+_VIDEO_PORTS = frozenset(ids.VIDEO_PORTS)
+_USB_HID_PORTS = frozenset(ids.USB_HID_PORTS)
+
+
 def _FlowMethod(func):
   """Decorator that checks the if port_id exists on board."""
   @functools.wraps(func)
@@ -34,18 +46,26 @@ def _AudioMethod(input_only=False, output_only=False):
     input_only: True to check if port is an input port.
     output_only: True to check if port is an output port.
   """
+  if input_only:
+    valid_ports = _AUDIO_INPUT_PORTS
+  elif output_only:
+    valid_ports = _AUDIO_OUTPUT_PORTS
+  else:
+    valid_ports = _AUDIO_PORTS
+
   def _ActualDecorator(func):
     @functools.wraps(func)
     def wrapper(instance, port_id, *args, **kwargs):
-      if not ids.IsAudioPort(port_id):
-        raise FlowManagerError(
-            'Not a valid port_id for audio operation: %d' % port_id)
-      if input_only and not ids.IsInputPort(port_id):
-        raise FlowManagerError(
-            'Not a valid port_id for input operation: %d' % port_id)
-      elif output_only and not ids.IsOutputPort(port_id):
-        raise FlowManagerError(
-            'Not a valid port_id for output operation: %d' % port_id)
+      if port_id not in valid_ports:
+        if port_id not in _AUDIO_PORTS:
+          raise FlowManagerError(
+              'Not a valid port_id for audio operation: %d' % port_id)
+        elif input_only:
+          raise FlowManagerError(
+              'Not a valid port_id for input operation: %d' % port_id)
+        else:
+          raise FlowManagerError(
+              'Not a valid port_id for output operation: %d' % port_id)
       return func(instance, port_id, *args, **kwargs)
     return wrapper
   return _ActualDecorator
@@ -55,7 +75,7 @@ def _VideoMethod(func):
   """Decorator that checks the port_id argument is a video port."""
   @functools.wraps(func)
   def wrapper(instance, port_id, *args, **kwargs):
-    if not ids.IsVideoPort(port_id):
+    if port_id not in _VIDEO_PORTS:
       raise FlowManagerError('Not a valid port_id for video operation: %d' %
                              port_id)
     return func(instance, port_id, *args, **kwargs)
@@ -66,7 +86,7 @@ def _USBHIDMethod(func):
   """Decorator that checks the port_id argument is a USB HID port."""
   @functools.wraps(func)
   def wrapper(instance, port_id, *args, **kwargs):
-    if not ids.IsUSBHIDPort(port_id):
+    if port_id not in _USB_HID_PORTS:
       raise FlowManagerError('Not a valid port_id for HID operation: %d' %
                              port_id)
     return func(instance, port_id, *args, **kwargs)
@@ -78,6 +98,9 @@ class FlowManager(object):
 
   It is used for backward compatible of flow based APIs.
   """
+  _DEFAULT_EDID_PATH = os.path.join(os.path.dirname(os.path.realpath(__file__)),
+                                    '..', 'data', 'default_edid.bin')
+
   def __init__(self, flows_table):
     """Constructs a FlowManager object.
 
@@ -97,6 +120,13 @@ class FlowManager(object):
     self._selected_output = None
     # Reserve index 0 as the default EDID.
     self._all_edids = [self._ReadDefaultEdid()]
+    # A heap of the destroyed EDID IDs, so CreateEdid reuses the lowest one.
+    self._free_edid_ids = []
+    # The flow table is fixed after detection. Keep the supported port groups
+    # for the getters and the probes, which clients poll.
+    self._supported_ports = tuple(sorted(flows_table))
+    self._supported_inputs = self._RetrievePortsInFlowTable(ids.INPUT_PORTS)
+    self._supported_outputs = self._RetrievePortsInFlowTable(ids.OUTPUT_PORTS)
 
   def _RetrievePortsInFlowTable(self, ports):
     """Retrieve intersection of ports and keys of flow table.
@@ -108,9 +138,9 @@ class FlowManager(object):
       ports: A list of port_id.
 
     Returns:
-      A list of port_id which can be detected on board.
+      A tuple of port_id which can be detected on board.
     """
-    return list(set(ports) & set(self.flows.keys()))
+    return tuple(sorted(set(ports).intersection(self.flows)))
 
   @_FlowMethod
   def SelectInput(self, port_id):
@@ -148,7 +178,7 @@ class FlowManager(object):
     for port_id in self.GetSupportedPorts():
       if self.HasAudioSupport(port_id):
         # Stops all audio capturing.
-        if ids.IsInputPort(port_id) and self.flows[port_id].is_capturing_audio:
+        if port_id in _INPUT_PORTS and self.flows[port_id].is_capturing_audio:
           try:
             self.flows[port_id].StopCapturingAudio()
           except Exception as e:
@@ -169,7 +199,7 @@ class FlowManager(object):
     Returns:
       A tuple of port_id, for all supported ports on the board.
     """
-    return self.flows.keys()
+    return self._supported_ports
 
   def GetSupportedInputs(self):
     """Returns all supported input ports on the board.
@@ -180,7 +210,7 @@ class FlowManager(object):
     Returns:
       A tuple of port_id, for all supported input port on the board.
     """
-    return self._RetrievePortsInFlowTable(ids.INPUT_PORTS)
+    return self._supported_inputs
 
   def GetSupportedOutputs(self):
     """Returns all supported output ports on the board.
@@ -191,7 +221,7 @@ class FlowManager(object):
     Returns:
       A tuple of port_id, for all supported output port on the board.
     """
-    return self._RetrievePortsInFlowTable(ids.OUTPUT_PORTS)
+    return self._supported_outputs
 
   def IsPhysicalPlugged(self, port_id):
     """Returns true if the physical cable is plugged between DUT and Chameleon.
@@ -204,14 +234,30 @@ class FlowManager(object):
     """
     return self.flows[port_id].IsPhysicalPlugged()
 
+  def _ProbePhysicalPlugged(self, ports):
+    """Probes the physical plug status of the given ports in a single pass.
+
+    The video receivers share the main I2C bus, which is driven by a single
+    I2C controller emulated in FPGA, so the probes can't be issued in
+    parallel. Walk the flows once and query them directly.
+
+    Args:
+      ports: A list of port_id.
+
+    Returns:
+      A tuple of port_id, for the ports connected to DUT.
+    """
+    flows = self.flows
+    return tuple(port_id for port_id in ports
+                 if flows[port_id].IsPhysicalPlugged())
+
   def ProbePorts(self):
     """Probes all the connected ports on Chameleon board.
 
     Returns:
       A tuple of port_id, for the ports connected to DUT.
     """
-    return tuple(port_id for port_id in self.GetSupportedPorts()
-                 if self.IsPhysicalPlugged(port_id))
+    return self._ProbePhysicalPlugged(self.GetSupportedPorts())
 
   def ProbeInputs(self):
     """Probes all the connected input ports on Chameleon board.
@@ -219,8 +265,7 @@ class FlowManager(object):
     Returns:
       A tuple of port_id, for the input ports connected to DUT.
     """
-    return tuple(port_id for port_id in self.GetSupportedInputs()
-                 if self.IsPhysicalPlugged(port_id))
+    return self._ProbePhysicalPlugged(self.GetSupportedInputs())
 
   def ProbeOutputs(self):
     """Probes all the connected output ports on Chameleon board.
@@ -228,8 +273,7 @@ class FlowManager(object):
     Returns:
       A tuple of port_id, for the output ports connected to DUT.
     """
-    return tuple(port_id for port_id in self.GetSupportedOutputs()
-                 if self.IsPhysicalPlugged(port_id))
+    return self._ProbePhysicalPlugged(self.GetSupportedOutputs())
 
   def GetConnectorType(self, port_id):
     """Returns the human readable string for the connector type.
@@ -252,7 +296,7 @@ class FlowManager(object):
     Returns:
       True if the input/output port has audio support; otherwise, False.
     """
-    return ids.IsAudioPort(port_id)
+    return port_id in _AUDIO_PORTS
 
   @_FlowMethod
   def HasVideoSupport(self, port_id):
@@ -264,7 +308,7 @@ class FlowManager(object):
     Returns:
       True if the input/output port has video support; otherwise, False.
     """
-    return ids.IsVideoPort(port_id)
+    return port_id in _VIDEO_PORTS
 
   @_FlowMethod
   @_VideoMethod
@@ -304,9 +348,8 @@ class FlowManager(object):
     Returns:
       A byte array of EDID data.
     """
-    driver_dir = os.path.dirname(os.path.realpath(__file__))
-    edid_path = os.path.join(driver_dir, '..', 'data', 'default_edid.bin')
-    return open(edid_path).read()
+    with open(self._DEFAULT_EDID_PATH, 'rb') as f:
+      return f.read()
 
   def CreateEdid(self, edid):
     """Creates an internal record of EDID using the given byte array.
@@ -317,8 +360,8 @@ class FlowManager(object):
     Returns:
       An edid_id.
     """
-    if None in self._all_edids:
-      last = self._all_edids.index(None)
+    if self._free_edid_ids:
+      last = heapq.heappop(self._free_edid_ids)
       self._all_edids[last] = edid.data
     else:
       last = len(self._all_edids)
@@ -332,7 +375,9 @@ class FlowManager(object):
       edid_id: The ID of the EDID, which was created by CreateEdid().
     """
     if edid_id > ids.EDID_ID_DEFAULT:
-      self._all_edids[edid_id] = None
+      if self._all_edids[edid_id] is not None:
+        self._all_edids[edid_id] = None
+        heapq.heappush(self._free_edid_ids, edid_id)
     else:
       raise FlowManagerError('Not a valid edid_id.')
 
@@ -471,7 +516,7 @@ class FlowManager(object):
 
   @_FlowMethod
   @_VideoMethod
-  def FireMixedHpdPulses(self, port_id, widths_msec):
+  def FireMixedHpdPulses(self, port_id, widths_msec, hpd_only=False):
     """Fires one or more HPD pulses, starting at low, of mixed widths.
 
     One must specify a list of segment widths in the widths_msec argument where
@@ -481,16 +526,23 @@ class FlowManager(object):
     The HPD line stops at low if even number of segment widths are specified;
     otherwise, it stops at high.
 
-    The method is equivalent to a series of calls to Unplug() and Plug()
-    separated by specified pulse widths.
+    By default, the method is equivalent to a series of calls to Unplug() and
+    Plug() separated by specified pulse widths. With hpd_only, the whole
+    pattern is fired by the FPGA HPD controller, which only toggles the HPD
+    line, as FireHpdPulse() does on DP and HDMI: the EDID and DDC stay enabled
+    during the low segments and no transition is retried. It supports the DP
+    and HDMI ports, and up to 20 segments of positive widths.
 
     Args:
       port_id: The ID of the video input port.
       widths_msec: list of pulse segment widths in milli-second.
+      hpd_only: True to only toggle the HPD line by the FPGA HPD controller;
+                False to call Unplug() and Plug().
     """
-    logging.info('Fire mixed HPD pulse on port #%d, ending with %s',
-                 port_id, 'high' if len(widths_msec) % 2 else 'low')
-    return self.flows[port_id].FireMixedHpdPulses(widths_msec)
+    logging.info('Fire mixed HPD pulse%s on port #%d, ending with %s',
+                 ' (HPD only)' if hpd_only else '', port_id,
+                 'high' if len(widths_msec) % 2 else 'low')
+    return self.flows[port_id].FireMixedHpdPulses(widths_msec, hpd_only)
 
   @_FlowMethod
   @_VideoMethod
@@ -712,7 +764,7 @@ class FlowManager(object):
     if self._selected_input != port_id:
       raise FlowManagerError(
           'The input is selected to %r not %r' % (self._selected_input, port_id))
-    if ids.IsOutputPort(port_id):
+    if port_id in _OUTPUT_PORTS:
       raise FlowManagerError(
           'Output ports don\'t support GetAudioChannelMapping yet')
     return self.flows[port_id].GetAudioChannelMapping()
@@ -807,7 +859,7 @@ class FlowManager(object):
     Raises:
       FlowManagerError: There is no file at the path.
     """
-    if not os.path.exists(path):
+    if not os.access(path, os.F_OK):
       raise FlowManagerError('File path %r does not exist' % path)
     self.SelectOutput(port_id)
     logging.info('Start playing audio from port #%d', port_id)
@@ -849,7 +901,7 @@ class FlowManager(object):
     Raises:
       FlowManagerError: input_id is not valid for audio operation.
     """
-    if not ids.IsAudioPort(input_id) or not ids.IsInputPort(input_id):
+    if input_id not in _AUDIO_INPUT_PORTS:
       raise FlowManagerError(
           'Not a valid input_id for audio operation: %d' % input_id)
     self.SelectInput(input_id)
@@ -877,6 +929,19 @@ class FlowManager(object):
     logging.info('Stop playing audio from port #%d', port_id)
     self.flows[port_id].StopPlayingAudio()
 
+  def _CheckUSBAudioFlowsIdle(self):
+    """Checks that the USB audio flows are neither playing nor capturing.
+
+    Raises:
+      FlowManagerError if any of the USB audio flows is playing or capturing
+      audio.
+    """
+    if (self.flows[ids.USB_AUDIO_IN].is_capturing_audio or
+        self.flows[ids.USB_AUDIO_OUT].is_playing_audio):
+      raise FlowManagerError('Configuration changes not allowed when USB audio '
+                             'driver is still performing playback/capture in '
+                             'one of the flows.')
+
   def SetUSBDriverPlaybackConfigs(self, playback_data_format):
     """Updates the corresponding playback configurations to argument values.
 
@@ -893,12 +958,7 @@ class FlowManager(object):
     Raises:
       FlowManagerError if any of the USB Flows is playing or capturing audio.
     """
-    if (self.flows[ids.USB_AUDIO_IN].is_capturing_audio or
-        self.flows[ids.USB_AUDIO_OUT].is_playing_audio):
-      error_message = ('Configuration changes not allowed when USB audio '
-                       'driver is still performing playback/capture in one of '
-                       'the flows.')
-      raise FlowManagerError(error_message)
+    self._CheckUSBAudioFlowsIdle()
     self.flows[ids.USB_AUDIO_OUT].SetDriverPlaybackConfigs(
         playback_data_format)
 
@@ -918,12 +978,7 @@ class FlowManager(object):
       FlowManagerError if any of the USB audio Flows is playing or capturing
       audio.
     """
-    if (self.flows[ids.USB_AUDIO_IN].is_capturing_audio or
-        self.flows[ids.USB_AUDIO_OUT].is_playing_audio):
-      error_message = ('Configuration changes not allowed when USB audio '
-                       'driver is still performing playback/capture in one of '
-                       'the flows.')
-      raise FlowManagerError(error_message)
+    self._CheckUSBAudioFlowsIdle()
     self.flows[ids.USB_AUDIO_IN].SetDriverCaptureConfigs(capture_data_format)
 
   @_FlowMethod
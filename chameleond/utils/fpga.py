@@ -57,9 +57,18 @@ class HpdController(object):
       ids.DP2: 0x8,
       ids.HDMI: 0xc
   }
+  # Absolute register addresses, resolved once for the status and plug paths.
+  _HPD_REGS = {
+      ids.DP1: _HPD_BASE + _HPD_OFFSETS[ids.DP1],
+      ids.DP2: _HPD_BASE + _HPD_OFFSETS[ids.DP2],
+      ids.HDMI: _HPD_BASE + _HPD_OFFSETS[ids.HDMI]
+  }
   _BIT_UNPLUG = 0
   _BIT_PLUG = 1
 
+  # The maximal number of segments hpd_control accepts for mixed pulses.
+  MAX_MIXED_PULSE_SEGMENTS = 20
+
   def __init__(self):
     """Constructs a HpdController object."""
     self._memory = mem.MemoryForController
@@ -73,8 +82,7 @@ class HpdController(object):
     Returns:
       True if the HPD line is plugged; otherwise, False.
     """
-    return (self._memory.Read(self._HPD_BASE + self._HPD_OFFSETS[input_id]) ==
-            self._BIT_PLUG)
+    return self._memory.Read(self._HPD_REGS[input_id]) == self._BIT_PLUG
 
   def Plug(self, input_id):
     """Asserts HPD line to high, emulating plug.
@@ -82,8 +90,7 @@ class HpdController(object):
     Args:
       input_id: The ID of the input connector. Check the value in ids.py.
     """
-    self._memory.Write(self._HPD_BASE + self._HPD_OFFSETS[input_id],
-                       self._BIT_PLUG)
+    self._memory.Write(self._HPD_REGS[input_id], self._BIT_PLUG)
 
   def Unplug(self, input_id):
     """Deasserts HPD line to low, emulating unplug.
@@ -91,8 +98,7 @@ class HpdController(object):
     Args:
       input_id: The ID of the input connector. Check the value in ids.py.
     """
-    self._memory.Write(self._HPD_BASE + self._HPD_OFFSETS[input_id],
-                       self._BIT_UNPLUG)
+    self._memory.Write(self._HPD_REGS[input_id], self._BIT_UNPLUG)
 
   def FireHpdPulse(
       self, input_id, deassert_interval_usec, assert_interval_usec,
@@ -297,6 +303,12 @@ class VideoDumper(object):
     field_size = ((field_size - 1) / PAGE_SIZE + 1) * PAGE_SIZE
     return cls._DUMP_BUFFER_SIZE / field_size
 
+  @classmethod
+  def GetMaxHashLimit(cls, dual_pixel_mode):
+    """Returns the number of field hashes the hash buffer holds."""
+    # A hash uses a single hash32 on dual pixel mode; otherwise, two.
+    return cls._REG_HASH_BUF_SIZE / (4 if dual_pixel_mode else 8)
+
   def SetFieldLimit(self, field_limit, loop=False):
     """Sets the limitation of total fields to dump.
 
@@ -363,30 +375,37 @@ class VideoDumper(object):
     return self._memory.Read(self._REGS_BASE[self._index] +
                              self._REG_FRAME_COUNT)
 
-  def GetFieldHash(self, index, dual_pixel_mode):
-    """Gets the field hash of the given field index.
+  def GetFieldHashes(self, start, stop, dual_pixel_mode):
+    """Gets the field hashes of the given range of field indexes.
+
+    Only the hash32 values of the range are read. The range may wrap around
+    the end of the hash buffer.
 
     FPGA overwrites the old hash values when exceeding the hash buffer
     size. The caller should save the old values before that happens.
 
     Args:
-      index: The index of field. The index can exceed the hash buffer size.
+      start: The index of the start field. The index can exceed the hash
+             buffer size.
+      stop: The index of the stop field (excluded).
       dual_pixel_mode: True if using the dual pixel mode; otherwise, False.
 
     Returns:
-      A list of hash16 values.
+      A list of field hashes, in which each element is a list of hash16
+      values: 2 values on dual pixel mode; otherwise, 4 values.
     """
-    hash_addr = lambda x: (
-        self._REGS_BASE[self._index] +
-        self._REG_HASH_BUF_BASE + (x * 4) % self._REG_HASH_BUF_SIZE)
-
+    words = self._REG_HASH_BUF_SIZE / 4
+    words_per_field = 1 if dual_pixel_mode else 2
+    first = start * words_per_field % words
+    count = (stop - start) * words_per_field
+    # The words wrap around the end of the buffer, as the field indexes do.
+    offsets = [(first + i) % words for i in xrange(count)]
+    hash_base = self._REGS_BASE[self._index] + self._REG_HASH_BUF_BASE
+    hash32s = [self._memory.Read(hash_base + offset * 4) for offset in offsets]
     if dual_pixel_mode:
-      hash32 = self._memory.Read(hash_addr(index))
-      return [hash32 >> 16, hash32 & 0xffff]
-    else:
-      hash32s = [self._memory.Read(hash_addr(index * 2 + i)) for i in (0, 1)]
-      return [hash32s[1] >> 16, hash32s[1] & 0xffff,
-              hash32s[0] >> 16, hash32s[0] & 0xffff]
+      return [[hash32 >> 16, hash32 & 0xffff] for hash32 in hash32s]
+    return [[odd >> 16, odd & 0xffff, even >> 16, even & 0xffff]
+            for even, odd in zip(hash32s[::2], hash32s[1::2])]
 
   @classmethod
   def GetPixelDumpArgs(cls, input_id, dual_pixel_mode):
@@ -439,9 +458,11 @@ class EdidController(object):
     Args:
       data: The EDID control to write.
     """
-    for offset in range(0, len(data), 4):
-      value = struct.unpack('>I', data[offset:offset+4])[0]
-      self._memory.Write(self._edid_base + self._EDID_MEM + offset, value)
+    # Unpack all the 32-bit words at once; FPGA only accepts word writes.
+    values = struct.unpack('>%dI' % (len(data) / 4), data)
+    address = self._edid_base + self._EDID_MEM
+    for offset, value in enumerate(values):
+      self._memory.Write(address + offset * 4, value)
 
   def ReadEdid(self):
     """Reads the EDID content.
@@ -449,11 +470,10 @@ class EdidController(object):
     Returns:
       A byte array of EDID data.
     """
-    all_value = ''
-    for offset in range(0, self._EDID_SIZE, 4):
-      value = self._memory.Read(self._edid_base + self._EDID_MEM + offset)
-      all_value += struct.pack('>I', value)
-    return all_value
+    address = self._edid_base + self._EDID_MEM
+    values = [self._memory.Read(address + offset)
+              for offset in xrange(0, self._EDID_SIZE, 4)]
+    return struct.pack('>%dI' % len(values), *values)
 
 
 # Audio Routing
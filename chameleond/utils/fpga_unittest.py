@@ -0,0 +1,60 @@
+#!/usr/bin/env python
+# Copyright 2017 The Chromium OS Authors. All rights reserved.
+# Use of this source code is governed by a BSD-style license that can be
+# found in the LICENSE file.
+"""Unit tests for the fpga module."""
+
+import unittest
+
+import chameleon_common  # pylint: disable=W0611
+from chameleond.utils import fpga
+
+
+class FakeMemory(object):
+  """A fake memory whose 32-bit word at each address is the address itself."""
+
+  def __init__(self):
+    self.read_addresses = []
+
+  def Read(self, address):
+    self.read_addresses.append(address)
+    return address
+
+
+class GetFieldHashesTest(unittest.TestCase):
+  """Tests VideoDumper.GetFieldHashes."""
+
+  _HASH_BASE = 0xff210400
+  _WORDS = 256
+
+  def setUp(self):
+    self.memory = FakeMemory()
+    self.vdump = fpga.VideoDumper(0)
+    self.vdump._memory = self.memory
+
+  def _Address(self, offset):
+    return self._HASH_BASE + offset * 4
+
+  def testDualPixelMode(self):
+    hashes = self.vdump.GetFieldHashes(3, 5, True)
+    self.assertEqual([self._Address(3), self._Address(4)],
+                     self.memory.read_addresses)
+    address = self._Address(3)
+    self.assertEqual([address >> 16, address & 0xffff], hashes[0])
+
+  def testSinglePixelMode(self):
+    hashes = self.vdump.GetFieldHashes(1, 2, False)
+    even, odd = self._Address(2), self._Address(3)
+    self.assertEqual([even, odd], self.memory.read_addresses)
+    self.assertEqual([[odd >> 16, odd & 0xffff, even >> 16, even & 0xffff]],
+                     hashes)
+
+  def testWrapAround(self):
+    self.vdump.GetFieldHashes(self._WORDS - 1, self._WORDS + 2, True)
+    self.assertEqual([self._Address(offset)
+                      for offset in (self._WORDS - 1, 0, 1)],
+                     self.memory.read_addresses)
+
+
+if __name__ == '__main__':
+  unittest.main()
@@ -98,9 +98,11 @@ class FrameManager(object):
       line_len = width * PIXEL_LEN
       even_field = self._field_manager.ReadDumpedField(frame_index * 2)
       odd_field = self._field_manager.ReadDumpedField(frame_index * 2 + 1)
-      return ''.join([''.join([even_field[i:i+line_len],
-                               odd_field[i:i+line_len]])
-                      for i in xrange(0, len(even_field), line_len)])
+      # Interleave the lines in a single join, without building an
+      # intermediate list of merged line pairs as large as the frame.
+      return ''.join(field[i:i+line_len]
+                     for i in xrange(0, len(even_field), line_len)
+                     for field in (even_field, odd_field))
     else:
       return self._field_manager.ReadDumpedField(frame_index)
 
@@ -149,6 +149,23 @@ class _Memory(object):
           'Address %r exceeds end of mmap %r' % (end_addr, self._mmap_end))
     ctypes.memmove(local_addr, data, len(data))
 
+  def ReadBytes(self, address, size):
+    """Reads the given number of bytes from memory.
+
+    Args:
+      address: The memory address.
+      size: The number of bytes to read starting from that address.
+
+    Returns:
+      A string of the bytes.
+    """
+    local_addr = self._GetLocalAddress(address)
+    end_addr = address + size
+    if end_addr > self._mmap_end:
+      raise IOError(
+          'Address %r exceeds end of mmap %r' % (end_addr, self._mmap_end))
+    return ctypes.string_at(local_addr, size)
+
 
 # Address space for memory-mapped I/O for controller.
 _MMAP_START_CONTROLLER = 0xff210000